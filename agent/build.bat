@@ -33,6 +33,8 @@ pyinstaller ^
     --hidden-import yaml ^
     --hidden-import requests ^
     --hidden-import urllib3 ^
+    --hidden-import lxml.etree ^
+    --hidden-import orjson ^
     main.py
 
 if %ERRORLEVEL% NEQ 0 (
@@ -62,6 +64,8 @@ pyinstaller ^
     --hidden-import yaml ^
     --hidden-import requests ^
     --hidden-import urllib3 ^
+    --hidden-import lxml.etree ^
+    --hidden-import orjson ^
     windows_service.py
 
 if %ERRORLEVEL% NEQ 0 (
@@ -7,7 +7,13 @@ import servicemanager
 import win32service
 import win32serviceutil
 
-from main import SecurityEventAgent, _load_config, _runtime_dir, _setup_logging
+from main import (
+    SecurityEventAgent,
+    _load_config,
+    _runtime_dir,
+    _setup_logging,
+    _stop_logging,
+)
 
 
 class SecurityMonitorService(win32serviceutil.ServiceFramework):
@@ -61,6 +67,7 @@ class SecurityMonitorService(win32serviceutil.ServiceFramework):
             )
             raise
         finally:
+            _stop_logging()
             servicemanager.LogInfoMsg("SecurityMonitorAgent service stopped.")
 
 
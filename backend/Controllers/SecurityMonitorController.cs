@@ -58,8 +58,7 @@ public class SecurityMonitorController : ControllerBase
 
         try
         {
-            health.ActiveVms = await _db.VMSources
-                .CountAsync(v => v.Status == "active");
+            health.ActiveVms = await _service.GetActiveVmCountAsync();
             health.DbConnected = true;
         }
         catch
@@ -147,19 +146,7 @@ public class SecurityMonitorController : ControllerBase
     {
         try
         {
-            var results = await _db.BlockedIPs
-                .Where(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now))
-                .Select(b => new BlockedIpDto
-                {
-                    IpAddress = b.IpAddress,
-                    BlockedAt = b.BlockedAt,
-                    BlockExpires = b.BlockExpires,
-                    Reason = b.Reason,
-                    BlockedBy = b.BlockedBy,
-                    Scope = b.Scope,
-                    TargetVmId = b.TargetVmId
-                })
-                .ToListAsync();
+            var results = await _service.GetBlockedIpsAsync();
 
             return Ok(new ListResponse<BlockedIpDto> { Success = true, Data = results, Count = results.Count });
         }
@@ -262,6 +249,7 @@ public class SecurityMonitorController : ControllerBase
             }
 
             await _db.SaveChangesAsync();
+            _service.InvalidateBlockCaches();
 
             return Ok(new MessageResponse
             {
@@ -478,6 +466,13 @@ public class SecurityMonitorController : ControllerBase
     // =========================================================================
     // GET /api/v1/feed  (Server-Sent Events)
     // =========================================================================
+    // Keep-alive pings are only sent after this long without an event,
+    // so idle dashboards don't wake the server every second.
+    private static readonly TimeSpan FeedPingInterval = TimeSpan.FromSeconds(15);
+
+    private static readonly JsonSerializerOptions FeedJsonOptions =
+        new() { PropertyNamingPolicy = JsonNamingPolicy.SnakeCaseLower };
+
     [AllowAnonymous]
     [HttpGet("api/v1/feed")]
     public async Task Feed(CancellationToken cancellationToken)
@@ -487,7 +482,6 @@ public class SecurityMonitorController : ControllerBase
         Response.Headers.Append("Connection", "keep-alive");
 
         var writer = Response.Body;
-        var jsonOptions = new JsonSerializerOptions { PropertyNamingPolicy = JsonNamingPolicy.SnakeCaseLower };
 
         // Each client gets its own subscriber channel (fixes single-consumer bug)
         var subscription = _broadcast.Subscribe();
@@ -501,45 +495,39 @@ public class SecurityMonitorController : ControllerBase
             // writes to Response.Body (fixes the race condition bug).
             while (!cts.Token.IsCancellationRequested)
             {
-                // Wait up to 1 second for an event; if none arrives, send a ping.
+                // Sleep until an event arrives; only if none does within
+                // FeedPingInterval, send a ping to keep the connection alive.
                 using var delayCts = CancellationTokenSource.CreateLinkedTokenSource(cts.Token);
-                delayCts.CancelAfter(TimeSpan.FromSeconds(1));
+                delayCts.CancelAfter(FeedPingInterval);
 
-                string message;
+                var message = new System.Text.StringBuilder();
                 try
                 {
-                    if (reader.TryRead(out var evt))
+                    if (!await reader.WaitToReadAsync(delayCts.Token))
                     {
-                        // Immediately available event
-                        var data = JsonSerializer.Serialize(evt, jsonOptions);
-                        message = $"event: new_attack\ndata: {data}\n\n";
+                        // Channel completed (service shutting down)
+                        break;
                     }
-                    else if (await reader.WaitToReadAsync(delayCts.Token))
+
+                    // Coalesce everything already queued into one write + flush
+                    while (reader.TryRead(out var evt))
                     {
-                        // Event became available within the 1s window
-                        if (reader.TryRead(out var evt2))
-                        {
-                            var data = JsonSerializer.Serialize(evt2, jsonOptions);
-                            message = $"event: new_attack\ndata: {data}\n\n";
-                        }
-                        else
-                        {
-                            continue;
-                        }
+                        var data = JsonSerializer.Serialize(evt, FeedJsonOptions);
+                        message.Append("event: new_attack\ndata: ").Append(data).Append("\n\n");
                     }
-                    else
+
+                    if (message.Length == 0)
                     {
-                        // Channel completed (service shutting down)
-                        break;
+                        continue;
                     }
                 }
                 catch (OperationCanceledException) when (!cts.Token.IsCancellationRequested)
                 {
-                    // The 1s delay expired — send a ping to keep the connection alive
-                    message = "event: ping\ndata: keep-alive\n\n";
+                    // No events for FeedPingInterval — send a keep-alive ping
+                    message.Append("event: ping\ndata: keep-alive\n\n");
                 }
 
-                await writer.WriteAsync(System.Text.Encoding.UTF8.GetBytes(message), cts.Token);
+                await writer.WriteAsync(System.Text.Encoding.UTF8.GetBytes(message.ToString()), cts.Token);
                 await writer.FlushAsync(cts.Token);
             }
         }
@@ -10,14 +10,25 @@ using SecurityMonitorApi.Services;
 var builder = WebApplication.CreateBuilder(args);
 
 // ---- Database (EF Core - Code First) ----
-builder.Services.AddDbContext<SecurityMonitorContext>(options =>
+// Pooled contexts: SqlClient already pools the connections themselves;
+// this also reuses the DbContext instances across requests.
+builder.Services.AddDbContextPool<SecurityMonitorContext>(options =>
     options.UseSqlServer(
         builder.Configuration.GetConnectionString("SecurityMonitor")));
 
 // ---- Services ----
+builder.Services.AddMemoryCache();
 builder.Services.AddScoped<SecurityMonitorService>();
 builder.Services.AddSingleton<EventBroadcastService>();
 
+// ---- Request decompression (agents gzip event batches) ----
+builder.Services.AddRequestDecompression();
+
+// ---- Response compression (Brotli/gzip for JSON responses) ----
+// The default MIME list covers application/json but not text/event-stream,
+// so the live feed is never held back by the compressor.
+builder.Services.AddResponseCompression();
+
 // ---- JWT Authentication ----
 var jwtSettings = builder.Configuration.GetSection("Jwt");
 var jwtKey = Encoding.UTF8.GetBytes(jwtSettings["Key"]!);
@@ -67,6 +78,8 @@ builder.Services.AddCors(options =>
 var app = builder.Build();
 
 // ---- Middleware pipeline ----
+app.UseRequestDecompression();
+app.UseResponseCompression();
 app.UseCors();
 app.UseAuthentication();
 app.UseAuthorization();
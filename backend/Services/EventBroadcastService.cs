@@ -6,27 +6,28 @@ namespace SecurityMonitorApi.Services;
 /// <summary>
 /// In-memory event bus for SSE real-time feed.
 /// Uses a subscriber-list pattern so every connected SSE client receives every event.
-/// Each subscriber gets its own unbounded channel; Publish fans out to all of them.
+/// Each subscriber gets its own bounded channel; Publish fans out to all of them.
+/// A client that falls more than SubscriberCapacity events behind loses its
+/// oldest pending events instead of growing server memory without limit.
 /// </summary>
 public class EventBroadcastService
 {
+    private const int SubscriberCapacity = 256;
+
     private readonly object _lock = new();
-    private readonly List<Channel<SseEventData>> _subscribers = new();
+
+    // Copy-on-write: Subscribe/Unsubscribe swap in a new array under _lock,
+    // so Publish can iterate the current one without locking or copying.
+    private volatile Channel<SseEventData>[] _subscribers = Array.Empty<Channel<SseEventData>>();
 
     /// <summary>
     /// Publish an event to ALL connected SSE clients.
     /// </summary>
     public void Publish(SseEventData data)
     {
-        List<Channel<SseEventData>> snapshot;
-        lock (_lock)
-        {
-            snapshot = new List<Channel<SseEventData>>(_subscribers);
-        }
-
-        foreach (var ch in snapshot)
+        foreach (var ch in _subscribers)
         {
-            // TryWrite on unbounded channel will always succeed unless the channel is closed
+            // Bounded DropOldest channel: TryWrite always succeeds unless the channel is closed
             ch.Writer.TryWrite(data);
         }
     }
@@ -38,15 +39,16 @@ public class EventBroadcastService
     /// </summary>
     public Channel<SseEventData> Subscribe()
     {
-        var ch = Channel.CreateUnbounded<SseEventData>(new UnboundedChannelOptions
+        var ch = Channel.CreateBounded<SseEventData>(new BoundedChannelOptions(SubscriberCapacity)
         {
+            FullMode = BoundedChannelFullMode.DropOldest,
             SingleReader = true,
             SingleWriter = false
         });
 
         lock (_lock)
         {
-            _subscribers.Add(ch);
+            _subscribers = _subscribers.Append(ch).ToArray();
         }
 
         return ch;
@@ -60,7 +62,7 @@ public class EventBroadcastService
     {
         lock (_lock)
         {
-            _subscribers.Remove(ch);
+            _subscribers = _subscribers.Where(s => s != ch).ToArray();
         }
 
         ch.Writer.TryComplete();
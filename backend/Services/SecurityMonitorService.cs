@@ -1,4 +1,5 @@
 using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.Caching.Memory;
 using SecurityMonitorApi.Data;
 using SecurityMonitorApi.DTOs;
 using SecurityMonitorApi.Models;
@@ -12,10 +13,12 @@ namespace SecurityMonitorApi.Services;
 public class SecurityMonitorService
 {
     private readonly SecurityMonitorContext _db;
+    private readonly IMemoryCache _cache;
 
-    public SecurityMonitorService(SecurityMonitorContext db)
+    public SecurityMonitorService(SecurityMonitorContext db, IMemoryCache cache)
     {
         _db = db;
+        _cache = cache;
     }
 
     // =========================================================================
@@ -29,6 +32,7 @@ public class SecurityMonitorService
         if (!string.IsNullOrEmpty(sourceVmId))
         {
             var perVm = await _db.PerVMThresholds
+                .AsNoTracking()
                 .FirstOrDefaultAsync(p => p.VmId == sourceVmId);
             
             if (perVm != null)
@@ -43,7 +47,7 @@ public class SecurityMonitorService
         }
 
         // Fall back to global settings
-        var settings = await _db.Settings.ToDictionaryAsync(s => s.KeyName, s => s.Value);
+        var settings = await _db.Settings.AsNoTracking().ToDictionaryAsync(s => s.KeyName, s => s.Value);
         
         int.TryParse(settings.GetValueOrDefault("GLOBAL_THRESHOLD", "5"), out var globalThreshold);
         int.TryParse(settings.GetValueOrDefault("TIME_WINDOW", "5"), out var timeWindow);
@@ -146,7 +150,7 @@ public class SecurityMonitorService
     /// </summary>
     public async Task<PerVmThresholdDto> GetGlobalThresholdAsync()
     {
-        var settings = await _db.Settings.ToDictionaryAsync(s => s.KeyName, s => s.Value);
+        var settings = await _db.Settings.AsNoTracking().ToDictionaryAsync(s => s.KeyName, s => s.Value);
         int.TryParse(settings.GetValueOrDefault("GLOBAL_THRESHOLD", "5"), out var threshold);
         int.TryParse(settings.GetValueOrDefault("TIME_WINDOW", "5"), out var timeWindow);
         int.TryParse(settings.GetValueOrDefault("BLOCK_DURATION", "60"), out var blockDuration);
@@ -164,17 +168,29 @@ public class SecurityMonitorService
 
     private async Task<bool> IsAutoBlockEnabledAsync()
     {
-        var setting = await _db.Settings.FirstOrDefaultAsync(s => s.KeyName == "ENABLE_AUTO_BLOCK");
+        var setting = await _db.Settings.AsNoTracking()
+            .FirstOrDefaultAsync(s => s.KeyName == "ENABLE_AUTO_BLOCK");
         return setting?.Value?.ToLower() == "true";
     }
 
+    // Active blocks for the IPs of the batch being recorded, loaded once by
+    // RecordFailedLoginBatchAsync so per-event checks don't query the DB.
+    private ILookup<string, (string Scope, string? TargetVmId)>? _batchBlocks;
+
     private async Task<bool> IsIpAlreadyBlockedAsync(string ipAddress, string? targetVmId = null)
     {
         var now = DateTime.Now;
 
         // Check committed DB rows — must be active AND not expired
         bool dbBlocked;
-        if (string.IsNullOrEmpty(targetVmId))
+        if (_batchBlocks != null)
+        {
+            dbBlocked = _batchBlocks[ipAddress].Any(b =>
+                string.IsNullOrEmpty(targetVmId) ||
+                b.Scope == "global" ||
+                b.TargetVmId == targetVmId);
+        }
+        else if (string.IsNullOrEmpty(targetVmId))
         {
             dbBlocked = await _db.BlockedIPs.AnyAsync(b =>
                 b.IpAddress == ipAddress &&
@@ -222,7 +238,7 @@ public class SecurityMonitorService
     {
         await RecordFailedLoginCoreAsync(ipAddress, username, hostname, logonType,
             failureReason, sourcePort, sourceVmId, eventTimestamp);
-        await _db.SaveChangesAsync();
+        await SaveRecordedLoginsAsync();
     }
 
     /// <summary>
@@ -234,20 +250,74 @@ public class SecurityMonitorService
             string? SourceVmId, DateTime? EventTimestamp)> events)
     {
         var eventsList = events.ToList();
-        
-        foreach (var ev in eventsList)
+
+        // Dedup keys for the whole batch in one query instead of one
+        // AnyAsync round trip per event.
+        var recorded = new HashSet<(string, string?, int?, DateTime, string?)>();
+        var stamped = eventsList.Where(e => e.EventTimestamp.HasValue).ToList();
+        if (stamped.Count > 0)
+        {
+            // Exact IPs and timestamps, not a min/max range: a batch can mix
+            // spooled events from hours ago with new ones.
+            var ips = stamped.Select(e => e.IpAddress).Distinct().ToList();
+            var timestamps = stamped.Select(e => e.EventTimestamp!.Value).Distinct().ToList();
+
+            var existing = await _db.FailedLoginAttempts
+                .AsNoTracking()
+                .Where(f => ips.Contains(f.IpAddress) && timestamps.Contains(f.Timestamp))
+                .Select(f => new { f.IpAddress, f.Username, f.SourcePort, f.Timestamp, f.SourceVmId })
+                .ToListAsync();
+
+            foreach (var f in existing)
+                recorded.Add((f.IpAddress, f.Username, f.SourcePort, f.Timestamp, f.SourceVmId));
+        }
+
+        var batchIps = eventsList.Select(e => e.IpAddress).Distinct().ToList();
+        var now = DateTime.Now;
+        var activeBlocks = await _db.BlockedIPs
+            .AsNoTracking()
+            .Where(b => batchIps.Contains(b.IpAddress) && b.IsActive
+                     && (b.BlockExpires == null || b.BlockExpires > now))
+            .Select(b => new { b.IpAddress, b.Scope, b.TargetVmId })
+            .ToListAsync();
+        _batchBlocks = activeBlocks.ToLookup(b => b.IpAddress, b => (b.Scope, b.TargetVmId));
+
+        try
+        {
+            foreach (var ev in eventsList)
+            {
+                await RecordFailedLoginCoreAsync(ev.IpAddress, ev.Username, ev.Hostname,
+                    ev.LogonType, ev.FailureReason, ev.SourcePort,
+                    ev.SourceVmId, ev.EventTimestamp, recorded);
+            }
+        }
+        finally
         {
-            await RecordFailedLoginCoreAsync(ev.IpAddress, ev.Username, ev.Hostname,
-                ev.LogonType, ev.FailureReason, ev.SourcePort,
-                ev.SourceVmId, ev.EventTimestamp);
+            _batchBlocks = null;
         }
 
+        await SaveRecordedLoginsAsync();
+    }
+
+    /// <summary>
+    /// Commit staged logins; drops the cached block lists if an auto-block was staged.
+    /// </summary>
+    private async Task SaveRecordedLoginsAsync()
+    {
+        var autoBlocked = _db.ChangeTracker.Entries<BlockedIp>()
+            .Any(e => e.State == EntityState.Added);
+
         await _db.SaveChangesAsync();
+
+        if (autoBlocked)
+            InvalidateBlockCaches();
     }
 
     /// <summary>
     /// Core logic for recording a single failed login — stages changes but does NOT call SaveChanges.
     /// Also handles threshold detection and auto-blocking.
+    /// When <paramref name="recorded"/> is given (batch path), it holds the dedup keys
+    /// already in the DB or staged in this batch, and replaces the per-event lookups.
     /// </summary>
     private async Task RecordFailedLoginCoreAsync(
         string ipAddress,
@@ -257,32 +327,42 @@ public class SecurityMonitorService
         string? failureReason,
         int? sourcePort,
         string? sourceVmId,
-        DateTime? eventTimestamp)
+        DateTime? eventTimestamp,
+        HashSet<(string, string?, int?, DateTime, string?)>? recorded = null)
     {
         var ts = eventTimestamp ?? DateTime.Now;
 
-        // Dedup: skip if this exact event was already recorded (check DB + change tracker)
-        var exists = await _db.FailedLoginAttempts.AnyAsync(f =>
-            f.IpAddress == ipAddress &&
-            f.Username == username &&
-            f.SourcePort == sourcePort &&
-            f.Timestamp == ts &&
-            f.SourceVmId == sourceVmId);
-
-        if (exists)
-            return;
-
-        // Also check staged (uncommitted) entities in the same batch
-        var stagedExists = _db.ChangeTracker.Entries<FailedLoginAttempt>()
-            .Any(e => e.State == EntityState.Added
-                   && e.Entity.IpAddress == ipAddress
-                   && e.Entity.Username == username
-                   && e.Entity.SourcePort == sourcePort
-                   && e.Entity.Timestamp == ts
-                   && e.Entity.SourceVmId == sourceVmId);
-
-        if (stagedExists)
-            return;
+        if (recorded != null)
+        {
+            // Batch path: prefetched DB keys plus everything staged so far
+            if (!recorded.Add((ipAddress, username, sourcePort, ts, sourceVmId)))
+                return;
+        }
+        else
+        {
+            // Dedup: skip if this exact event was already recorded (check DB + change tracker)
+            var exists = await _db.FailedLoginAttempts.AnyAsync(f =>
+                f.IpAddress == ipAddress &&
+                f.Username == username &&
+                f.SourcePort == sourcePort &&
+                f.Timestamp == ts &&
+                f.SourceVmId == sourceVmId);
+
+            if (exists)
+                return;
+
+            // Also check staged (uncommitted) entities in the same batch
+            var stagedExists = _db.ChangeTracker.Entries<FailedLoginAttempt>()
+                .Any(e => e.State == EntityState.Added
+                       && e.Entity.IpAddress == ipAddress
+                       && e.Entity.Username == username
+                       && e.Entity.SourcePort == sourcePort
+                       && e.Entity.Timestamp == ts
+                       && e.Entity.SourceVmId == sourceVmId);
+
+            if (stagedExists)
+                return;
+        }
 
         // Insert the failed login attempt
         _db.FailedLoginAttempts.Add(new FailedLoginAttempt
@@ -443,10 +523,12 @@ public class SecurityMonitorService
         // Return all IPs with meaningful activity (>= 2 attempts).
         // Include ALL statuses — this is an intelligence/monitoring view.
         // Compute risk_level based on how close they are to the threshold.
-        var ips = await _db.SuspiciousIPs
+        // The rows are threshold-independent, so one cached list serves every threshold.
+        var ips = await GetCachedAsync(SuspiciousIpsCacheKey, () => _db.SuspiciousIPs
+            .AsNoTracking()
             .Where(s => s.FailedAttempts >= 2)
             .OrderByDescending(s => s.FailedAttempts)
-            .ToListAsync();
+            .ToListAsync());
 
         return ips.Select(s =>
         {
@@ -489,6 +571,24 @@ public class SecurityMonitorService
         }).ToList();
     }
 
+    // =========================================================================
+    // Active blocks (GET /api/v1/blocked-ips)
+    // =========================================================================
+    public Task<List<BlockedIpDto>> GetBlockedIpsAsync() =>
+        GetCachedAsync(BlockedIpsCacheKey, () => _db.BlockedIPs
+            .Where(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now))
+            .Select(b => new BlockedIpDto
+            {
+                IpAddress = b.IpAddress,
+                BlockedAt = b.BlockedAt,
+                BlockExpires = b.BlockExpires,
+                Reason = b.Reason,
+                BlockedBy = b.BlockedBy,
+                Scope = b.Scope,
+                TargetVmId = b.TargetVmId
+            })
+            .ToListAsync());
+
     // =========================================================================
     // Equivalent of sp_BlockIP
     // =========================================================================
@@ -514,6 +614,7 @@ public class SecurityMonitorService
         }
 
         await _db.SaveChangesAsync();
+        InvalidateBlockCaches();
     }
 
     // =========================================================================
@@ -556,6 +657,7 @@ public class SecurityMonitorService
         }
 
         await _db.SaveChangesAsync();
+        InvalidateBlockCaches();
     }
 
     // =========================================================================
@@ -635,22 +737,98 @@ public class SecurityMonitorService
     // =========================================================================
     // Statistics
     // =========================================================================
-    public async Task<StatisticsData> GetStatisticsAsync()
+    /// <summary>
+    /// Headline FailedLoginAttempts counts in a single aggregate query
+    /// (one round trip instead of four separate COUNTs).
+    /// </summary>
+    private async Task<(int Total, int UniqueAttackers, int Last24h, int LastHour)>
+        GetAttackCountsAsync(DateTime last24h, DateTime lastHour)
     {
-        var totalFailed = await _db.FailedLoginAttempts.CountAsync();
-        var uniqueAttackers = await _db.FailedLoginAttempts
-            .Select(f => f.IpAddress).Distinct().CountAsync();
-        var blockedIps = await _db.BlockedIPs
-            .CountAsync(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now));
+        var counts = await _db.FailedLoginAttempts
+            .GroupBy(f => 1)
+            .Select(g => new
+            {
+                Total = g.Count(),
+                UniqueAttackers = g.Select(f => f.IpAddress).Distinct().Count(),
+                Last24h = g.Count(f => f.Timestamp >= last24h),
+                LastHour = g.Count(f => f.Timestamp >= lastHour)
+            })
+            .FirstOrDefaultAsync();
+
+        // No rows at all -> no group
+        if (counts == null)
+            return (0, 0, 0, 0);
+
+        return (counts.Total, counts.UniqueAttackers, counts.Last24h, counts.LastHour);
+    }
+
+    // Dashboards poll the statistics and IP-list endpoints; serve a briefly
+    // cached result so concurrent/overlapping polls share one set of scans.
+    private static readonly TimeSpan CacheTtl = TimeSpan.FromSeconds(10);
+    private static readonly SemaphoreSlim CacheLock = new(1, 1);
+
+    private const string BlockedIpsCacheKey = "blocked-ips";
+    private const string SuspiciousIpsCacheKey = "suspicious-ips";
+
+    private async Task<T> GetCachedAsync<T>(string key, Func<Task<T>> compute)
+        where T : class
+    {
+        if (_cache.TryGetValue(key, out T? cached) && cached != null)
+            return cached;
+
+        // Only one request recomputes; the rest wait and reuse its result
+        await CacheLock.WaitAsync();
+        try
+        {
+            if (_cache.TryGetValue(key, out cached) && cached != null)
+                return cached;
+
+            var result = await compute();
+            _cache.Set(key, result, CacheTtl);
+            return result;
+        }
+        finally
+        {
+            CacheLock.Release();
+        }
+    }
+
+    // Agents probe /health before sending; a short-lived count keeps
+    // frequent probes from re-running the aggregate.
+    private static readonly TimeSpan HealthCacheTtl = TimeSpan.FromSeconds(5);
+
+    public async Task<int> GetActiveVmCountAsync() =>
+        await _cache.GetOrCreateAsync("health:active-vms", entry =>
+        {
+            entry.AbsoluteExpirationRelativeToNow = HealthCacheTtl;
+            return _db.VMSources.CountAsync(v => v.Status == "active");
+        });
+
+    /// <summary>
+    /// Drop the cached blocked/suspicious IP lists after a block or unblock.
+    /// </summary>
+    public void InvalidateBlockCaches()
+    {
+        _cache.Remove(BlockedIpsCacheKey);
+        _cache.Remove(SuspiciousIpsCacheKey);
+    }
 
+    public Task<StatisticsData> GetStatisticsAsync() =>
+        GetCachedAsync("statistics", ComputeStatisticsAsync);
+
+    public Task<GlobalStatisticsData> GetGlobalStatisticsAsync() =>
+        GetCachedAsync("statistics:global", ComputeGlobalStatisticsAsync);
+
+    private async Task<StatisticsData> ComputeStatisticsAsync()
+    {
         var now = DateTime.Now;
         var last24h = now.AddHours(-24);
         var lastHour = now.AddHours(-1);
 
-        var attacksLast24h = await _db.FailedLoginAttempts
-            .CountAsync(f => f.Timestamp >= last24h);
-        var attacksLastHour = await _db.FailedLoginAttempts
-            .CountAsync(f => f.Timestamp >= lastHour);
+        var (totalFailed, uniqueAttackers, attacksLast24h, attacksLastHour) =
+            await GetAttackCountsAsync(last24h, lastHour);
+        var blockedIps = await _db.BlockedIPs
+            .CountAsync(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now));
 
         var topUsernames = await _db.FailedLoginAttempts
             .Where(f => f.Username != null)
@@ -693,25 +871,28 @@ public class SecurityMonitorService
         };
     }
 
-    public async Task<GlobalStatisticsData> GetGlobalStatisticsAsync()
+    private async Task<GlobalStatisticsData> ComputeGlobalStatisticsAsync()
     {
-        var totalFailed = await _db.FailedLoginAttempts.CountAsync();
-        var uniqueAttackers = await _db.FailedLoginAttempts
-            .Select(f => f.IpAddress).Distinct().CountAsync();
-        var blockedIps = await _db.BlockedIPs
-            .CountAsync(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now));
-
-        var activeVms = await _db.VMSources.CountAsync(v => v.Status == "active");
-        var inactiveVms = await _db.VMSources.CountAsync(v => v.Status == "inactive");
-
         var now = DateTime.Now;
         var last24h = now.AddHours(-24);
         var lastHour = now.AddHours(-1);
 
-        var attacksLast24h = await _db.FailedLoginAttempts
-            .CountAsync(f => f.Timestamp >= last24h);
-        var attacksLastHour = await _db.FailedLoginAttempts
-            .CountAsync(f => f.Timestamp >= lastHour);
+        var (totalFailed, uniqueAttackers, attacksLast24h, attacksLastHour) =
+            await GetAttackCountsAsync(last24h, lastHour);
+        var blockedIps = await _db.BlockedIPs
+            .CountAsync(b => b.IsActive && (b.BlockExpires == null || b.BlockExpires > DateTime.Now));
+
+        // Both VM status counts in one query
+        var vmCounts = await _db.VMSources
+            .GroupBy(v => 1)
+            .Select(g => new
+            {
+                Active = g.Count(v => v.Status == "active"),
+                Inactive = g.Count(v => v.Status == "inactive")
+            })
+            .FirstOrDefaultAsync();
+        var activeVms = vmCounts?.Active ?? 0;
+        var inactiveVms = vmCounts?.Inactive ?? 0;
 
         var attacksByVm = await _db.FailedLoginAttempts
             .Where(f => f.SourceVmId != null)